@@ -4,6 +4,8 @@ import logging
 import os
 import pickle
 import sys
+from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime, time, timezone
 from shutil import rmtree
 from typing import Optional
@@ -11,6 +13,11 @@ from typing import Optional
 from neo4j import GraphDatabase
 
 BATCH_SIZE = 50000
+# Properties identifying the dataset of a relationship.
+REFERENCE_PROPERTIES = ('reference_org', 'reference_url', 'reference_name', 'reference_time')
+# Number of nodes queued by enqueue_node before they are written to the database.
+NODE_BUFFER_SIZE = 10000
+
 
 prop_formatters = {
     # asn is stored as an int
@@ -23,14 +30,33 @@ prop_formatters = {
 }
 
 
-def format_properties(prop):
+class NormalizedDict(dict):
+    """Dictionary of properties that are already formatted.
+
+    format_properties returns these dictionaries as is, so that properties are only
+    formatted once.
+    """
+
+
+def format_properties(prop, inplace=False):
     """Make sure certain properties are always formatted the same way.
 
     For example IPv6 addresses are stored in lowercase, or ASN are kept as integer not
     string.
+
+    By default, prop is copied only if it contains a property that needs formatting,
+    otherwise it is returned as is. Use inplace=True to format prop in-place.
+    Formatted copies are returned as NormalizedDict and NormalizedDict inputs are
+    never formatted again.
     """
 
-    prop = dict(prop)
+    if isinstance(prop, NormalizedDict):
+        return prop
+
+    if not inplace:
+        if prop_formatters.keys().isdisjoint(prop):
+            return prop
+        prop = NormalizedDict(prop)
 
     for prop_name, formatter in prop_formatters.items():
         if prop_name in prop:
@@ -39,6 +65,18 @@ def format_properties(prop):
     return prop
 
 
+def remove_empty_properties(prop):
+    """Remove properties set to None, since Neo4j does not have the concept of empty
+    properties.
+
+    The dictionary is only copied if there is something to remove.
+    """
+
+    if any(value is None for value in prop.values()):
+        return {key: value for key, value in prop.items() if value is not None}
+    return prop
+
+
 def batch_format_link_properties(links: list, inplace=True) -> Optional[list]:
     """Helper function that applies format_properties to the relationship properties.
 
@@ -49,8 +87,8 @@ def batch_format_link_properties(links: list, inplace=True) -> Optional[list]:
     """
     if inplace:
         for link in links:
-            for idx, prop_dict in enumerate(link['props']):
-                link['props'][idx] = format_properties(prop_dict)
+            for prop_dict in link['props']:
+                format_properties(prop_dict, inplace=True)
         return None
     return [{'src_id': link['src_id'],
              'dst_id': link['dst_id'],
@@ -58,27 +96,38 @@ def batch_format_link_properties(links: list, inplace=True) -> Optional[list]:
             for link in links]
 
 
-def dict2str(d, eq=':', pfx=''):
-    """Converts a python dictionary to a Cypher map."""
+class NodePlaceholder(object):
+    """Handle for a node queued with IYP.enqueue_node.
 
-    data = []
-    for key, value in d.items():
-        if isinstance(value, str) and '"' in value:
-            escaped = value.replace("'", r"\'")
-            data.append(f"{pfx+key}{eq} '{escaped}'")
-        elif isinstance(value, str) or isinstance(value, datetime):
-            data.append(f'{pfx+key}{eq} "{value}"')
-        elif value is None:
-            # Neo4j does not have the concept of empty properties.
-            pass
-        else:
-            data.append(f'{pfx+key}{eq} {value}')
+    The id attribute is None until the node is written by IYP.flush_nodes.
+    """
+
+    __slots__ = ['id']
+
+    def __init__(self):
+        self.id = None
 
-    return '{' + ','.join(data) + '}'
+
+def resolve_node_id(node):
+    """Return the node ID of node, which is either a node ID or a NodePlaceholder.
+
+    Raise a ValueError if the placeholder was not resolved by IYP.flush_nodes.
+    """
+
+    if isinstance(node, NodePlaceholder):
+        if node.id is None:
+            raise ValueError('Node placeholder is not resolved, the queued node was not written.')
+        return node.id
+    return node
 
 
 class IYP(object):
 
+    # Names of the existing constraints and indexes, shared by all instances of the
+    # process. Creating constraints/indexes requires a commit and a round-trip, so
+    # existing ones are skipped.
+    _schema = None
+
     def __init__(self):
 
         logging.debug('IYP: Enter initialization')
@@ -89,6 +138,7 @@ class IYP(object):
         self.port = 7687
         self.login = 'neo4j'
         self.password = 'password'
+        self.database = 'neo4j'
 
         # Connect to the database
         uri = f'neo4j://{self.server}:{self.port}'
@@ -101,9 +151,47 @@ class IYP(object):
         # crash: https://neo4j.com/docs/python-manual/current/connect/
         self.db.verify_connectivity()
 
-        self.session = self.db.session()
-
-        self.tx = self.session.begin_transaction()
+        # Specify the database explicitly, otherwise the driver has to resolve the
+        # default database with an additional request.
+        # All writes go through this single session on purpose: links are created
+        # between nodes written earlier in the same, possibly uncommitted, transaction,
+        # and rollback() has to undo everything. Splitting node writes across sessions
+        # (e.g., one per label) would break both.
+        self.session = self.db.session(database=self.database)
+
+        if IYP._schema is None:
+            self.__load_schema()
+
+        # The transaction is started on first use, see the tx property.
+        self._tx = None
+
+        # Nodes queued with enqueue_node that are not yet written to the database.
+        # Maps (label, id_properties) to a list of property dicts.
+        self._pending_nodes = defaultdict(list)
+        # Placeholders returned by enqueue_node for the queued nodes, in the same order
+        # as the property dicts in _pending_nodes.
+        self._placeholders = defaultdict(list)
+        # IDs of the nodes created by get_node and flush_nodes.
+        # Maps (label, id properties) to the node ID, see __node_key. Nodes whose id
+        # properties can not be hashed are not cached.
+        self._node_ids = dict()
+        # IDs of the nodes found by get_node_extid.
+        # Maps (id_type, id) to the node ID.
+        self._extid_ids = dict()
+        # Queries built by get_node, see __get_node_query.
+        self._node_queries = dict()
+        # Commit threshold and number of uncommitted relationships, see write_batch.
+        self._write_batch_size = None
+        self._write_batch_count = 0
+
+    def __load_schema(self):
+        """Fetch the names of all existing constraints and indexes from the
+        database."""
+
+        names = set()
+        for query in ['SHOW CONSTRAINTS YIELD name', 'SHOW INDEXES YIELD name']:
+            names.update(record['name'] for record in self.session.run(query))
+        IYP._schema = names
 
     def __create_unique_constraint(self, label, prop):
         """Create a UNIQUE constraint on the given properties for the given node label.
@@ -120,12 +208,17 @@ class IYP(object):
         else:
             require_str = f'a.{prop}'
 
+        name = f'{label}_UNIQUE_{prop}'
+        if name in self._schema:
+            return
+
         # Schema modifications are not allowed in the same transaction as writes.
         self.commit()
-        self.tx.run(f"""CREATE CONSTRAINT {label}_UNIQUE_{prop} IF NOT EXISTS
+        self.tx.run(f"""CREATE CONSTRAINT {name} IF NOT EXISTS
                         FOR (a:{label})
                         REQUIRE {require_str} IS UNIQUE""")
         self.commit()
+        self._schema.add(name)
 
     def __create_range_index(self, label_type, prop, on_relationship):
         """Create a RANGE index (the default) on the given properties for the given node
@@ -148,30 +241,116 @@ class IYP(object):
         else:
             for_str = f'(a:{label_type})'
 
+        name = f'{label_type}_INDEX_{prop}'
+        if name in self._schema:
+            return
+
         # Schema modifications are not allowed in the same transaction as writes.
         self.commit()
-        self.tx.run(f"""CREATE INDEX {label_type}_INDEX_{prop} IF NOT EXISTS
+        self.tx.run(f"""CREATE INDEX {name} IF NOT EXISTS
                         FOR {for_str}
                         ON {on_str}""")
         self.commit()
+        self._schema.add(name)
+
+    @staticmethod
+    def __node_key(label, id_property_dict):
+        """Return the key used for the node ID cache or None if the properties can not
+        be hashed.
+
+        Only the label and the id properties are part of the key, so that lookups with
+        different descriptive properties still hit the cache.
+        """
+        node_key = (label, tuple(id_property_dict.items()))
+        try:
+            hash(node_key)
+        except TypeError:
+            return None
+        return node_key
+
+    @property
+    def tx(self):
+        """The current transaction of the session.
+
+        A new transaction is only started when it is used, so that committing without
+        pending queries does not cost a round-trip to the database.
+        """
+
+        if self._tx is None:
+            self._tx = self.session.begin_transaction()
+        return self._tx
 
     def commit(self):
-        """Commit all pending queries (node/link creation) and start a new
-        transaction."""
+        """Commit all pending queries (node/link creation).
 
-        self.tx.commit()
-        self.tx = self.session.begin_transaction()
+        A new transaction is started on the next use of tx.
+        """
+
+        self.flush_nodes()
+        if self._tx is not None:
+            self._tx.commit()
+            self._tx = None
+        self._write_batch_count = 0
 
     def rollback(self):
-        """Rollback all pending queries (node/link creation) and start a new
-        transaction."""
+        """Rollback all pending queries (node/link creation).
+
+        A new transaction is started on the next use of tx.
+        """
+
+        self._pending_nodes.clear()
+        self._placeholders.clear()
+        self._node_ids.clear()
+        self._extid_ids.clear()
+        if self._tx is not None:
+            self._tx.rollback()
+            self._tx = None
+        self._write_batch_count = 0
+
+    @contextmanager
+    def write_batch(self, size=20000):
+        """Group the writes of add_links into larger transactions.
+
+        By default, add_links commits after every call. Within this context, changes
+        are only committed once at least size relationships were written since the last
+        commit, and when leaving the outermost context without error. If an exception
+        is raised inside the context, the uncommitted changes are rolled back.
+        Nested contexts use their own size and restore the previous one on exit.
+
+        Usage:
+            with self.iyp.write_batch():
+                for ...:
+                    self.iyp.add_links(src_id, links)
+        """
+
+        previous_size = self._write_batch_size
+        self._write_batch_size = size
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        else:
+            if previous_size is None:
+                self.commit()
+        finally:
+            self._write_batch_size = previous_size
+
+    def __commit_write_batch(self, count):
+        """Commit changes, or only count the written relationships if inside a
+        write_batch context that did not reach its size yet."""
+
+        if self._write_batch_size is None:
+            self.commit()
+            return
 
-        self.tx.rollback()
-        self.tx = self.session.begin_transaction()
+        self._write_batch_count += count
+        if self._write_batch_count >= self._write_batch_size:
+            self.commit()
 
     def close(self):
         """Commit pending queries and close IYP."""
-        self.tx.commit()
+        self.commit()
         self.session.close()
         self.db.close()
 
@@ -211,18 +390,18 @@ class IYP(object):
             RETURN n.{prop_name} AS {prop_name}, ID(n) AS _id""", list_prop=list_prop)
 
         ids = {node[prop_name]: node['_id'] for node in existing_nodes}
-        existing_nodes_set = set(ids.keys())
-        missing_props = prop_set.difference(existing_nodes_set)
-        missing_nodes = [{prop_name: val} for val in missing_props]
+        # Pass the missing values as a plain list instead of creating one dict per
+        # node.
+        missing_props = list(prop_set.difference(ids))
 
         # Create missing nodes
         if create:
-            for i in range(0, len(missing_nodes), BATCH_SIZE):
-                batch = missing_nodes[i:i + BATCH_SIZE]
+            create_query = f"""UNWIND $batch AS value
+            CREATE (n:{label_str} {{{prop_name}: value}})
+            RETURN n.{prop_name} AS {prop_name}, ID(n) AS _id"""
 
-                create_query = f"""WITH $batch AS batch
-                UNWIND batch AS item CREATE (n:{label_str})
-                SET n = item RETURN n.{prop_name} AS {prop_name}, ID(n) AS _id"""
+            for i in range(0, len(missing_props), BATCH_SIZE):
+                batch = missing_props[i:i + BATCH_SIZE]
 
                 new_nodes = self.tx.run(create_query, batch=batch)
 
@@ -374,6 +553,7 @@ class IYP(object):
             raise NotImplementedError('Can not implicitly create multi-label nodes.')
 
         properties = format_properties(properties)
+        properties = remove_empty_properties(properties)
 
         # put type in a list
         label_str = str(label)
@@ -386,22 +566,159 @@ class IYP(object):
             if not id_properties:
                 id_property_dict = properties
             else:
+                missing = [prop for prop in id_properties if prop not in properties]
+                if missing:
+                    raise ValueError(f'get_node: id properties {missing} are missing or None.')
                 id_property_dict = {prop: properties[prop] for prop in id_properties}
+            if not id_property_dict:
+                raise ValueError('get_node: can not create a node without id properties.')
+
+            # The cache can only be used if there are no additional properties that
+            # need to be set.
+            node_key = self.__node_key(label, id_property_dict)
+            if node_key is not None and len(id_property_dict) == len(properties):
+                node_id = self._node_ids.get(node_key)
+                if node_id is not None:
+                    return node_id
+
+            # Queued nodes have to be written before the database is queried.
+            if self._pending_nodes:
+                self.flush_nodes()
             self.__create_unique_constraint(label, list(id_property_dict.keys()))
-            result = self.tx.run(
-                f"""MERGE (a:{label} {dict2str(id_property_dict)})
-                SET a += {dict2str(properties)}
-                RETURN ID(a)"""
-            ).single()
+            set_props = len(id_property_dict) != len(properties)
+            query = self.__get_node_query(label, tuple(id_property_dict.keys()), create, set_props)
+            result = self.tx.run(query, id_props=id_property_dict, props=properties).single()
+            if node_key is not None:
+                self._node_ids[node_key] = result[0]
         else:
+            node_key = self.__node_key(label_str, properties)
+            if node_key is not None:
+                node_id = self._node_ids.get(node_key)
+                if node_id is not None:
+                    return node_id
+
+            # Queued nodes have to be written before the database is queried.
+            if self._pending_nodes:
+                self.flush_nodes()
+
             # MATCH node
-            result = self.tx.run(f'MATCH (a:{label_str} {dict2str(properties)}) RETURN ID(a)').single()
+            query = self.__get_node_query(label_str, tuple(properties.keys()), create)
+            result = self.tx.run(query, props=properties).single()
 
         if result is not None:
             return result[0]
         else:
             return None
 
+    def __get_node_query(self, label, prop_keys, create, set_props=False):
+        """Return the query used by get_node for the given label and property keys.
+
+        Values are passed as parameters, so the query only depends on the label, the
+        keys and set_props, and is built once per combination. set_props specifies if
+        there are properties besides the id properties that need to be set on the merged
+        node; it is ignored if create=False.
+        """
+
+        query_key = (label, prop_keys, create, set_props)
+        query = self._node_queries.get(query_key)
+        if query is None:
+            if create:
+                where_clause = ', '.join([f'{prop}: $id_props.{prop}' for prop in prop_keys])
+                # The id properties are already set by MERGE.
+                set_line = 'SET a += $props' if set_props else ''
+                query = f"""MERGE (a:{label} {{{where_clause}}})
+                            {set_line}
+                            RETURN ID(a)"""
+            else:
+                where_clause = ', '.join([f'{prop}: $props.{prop}' for prop in prop_keys])
+                query = f'MATCH (a:{label} {{{where_clause}}}) RETURN ID(a)'
+            self._node_queries[query_key] = query
+        return query
+
+    def enqueue_node(self, label, properties, id_properties=list()):
+        """Queue a node for creation. Queued nodes are written to the database in
+        batches, either when NODE_BUFFER_SIZE nodes are queued or when flush_nodes is
+        called (implicitly done by add_links, commit and close).
+
+        Use this instead of get_node when the node ID is not needed right away. Once
+        the node is written, get_node returns its ID without querying the database.
+
+        label: a string for the node label. Multiple labels are not supported.
+        properties: dictionary of node properties.
+        id_properties: list of keys from properties that should be used as the search
+        predicate. If empty, all properties will be used.
+
+        Return a NodePlaceholder whose id attribute is set once the node is written.
+        The placeholder can be used in place of a node ID in add_links.
+        """
+
+        if isinstance(label, list):
+            raise NotImplementedError('Can not implicitly create multi-label nodes.')
+
+        # The properties are buffered until the next flush, so copy them in case the
+        # caller modifies the dict in the meantime.
+        formatted = format_properties(properties)
+        properties = dict(formatted) if formatted is properties else formatted
+        properties = remove_empty_properties(properties)
+
+        if not id_properties:
+            id_properties = list(properties.keys())
+        if not id_properties:
+            raise ValueError('enqueue_node: can not create a node without id properties.')
+        missing = [prop for prop in id_properties if prop not in properties]
+        if missing:
+            raise ValueError(f'enqueue_node: id properties {missing} are missing or None.')
+        group = (label, tuple(id_properties))
+
+        if group not in self._pending_nodes:
+            self.__create_unique_constraint(label, list(id_properties))
+
+        placeholder = NodePlaceholder()
+        self._placeholders[group].append(placeholder)
+
+        pending = self._pending_nodes[group]
+        pending.append(properties)
+        if len(pending) >= NODE_BUFFER_SIZE:
+            self.flush_nodes()
+
+        return placeholder
+
+    def flush_nodes(self):
+        """Write all nodes queued with enqueue_node to the database, cache their IDs
+        and set the id attribute of their placeholders.
+
+        This method does not commit changes.
+        """
+
+        pending = self._pending_nodes
+        placeholders = self._placeholders
+        self._pending_nodes = defaultdict(list)
+        self._placeholders = defaultdict(list)
+
+        # Send the queries of all groups before reading any result.
+        results = list()
+        for group, properties in pending.items():
+            label, id_properties = group
+            where_clause = ', '.join([f'{prop}: prop.{prop}' for prop in id_properties])
+            query = f"""UNWIND $props AS prop
+                        MERGE (a:{label} {{{where_clause}}})
+                        SET a += prop
+                        RETURN ID(a) AS _id"""
+
+            for i in range(0, len(properties), NODE_BUFFER_SIZE):
+                props = properties[i: i + NODE_BUFFER_SIZE]
+                batch_placeholders = placeholders[group][i: i + NODE_BUFFER_SIZE]
+                results.append((label, id_properties, props, batch_placeholders, self.tx.run(query, props=props)))
+
+        # The query returns one row per UNWIND row, in the same order as the queued
+        # nodes.
+        for label, id_properties, props, batch_placeholders, result in results:
+            for prop, placeholder, r in zip(props, batch_placeholders, result):
+                placeholder.id = r['_id']
+                node_key = self.__node_key(label, {key: prop[key] for key in id_properties})
+                if node_key is not None:
+                    self._node_ids[node_key] = r['_id']
+
     def batch_add_node_label(self, node_ids, label):
         """Add additional labels to existing nodes.
 
@@ -444,9 +761,19 @@ class IYP(object):
         Return None if the node does not exist.
         """
 
-        result = self.tx.run(f'MATCH (a)-[:EXTERNAL_ID]->(:{id_type} {{id:{id}}}) RETURN ID(a)').single()
+        try:
+            return self._extid_ids[(id_type, id)]
+        except KeyError:
+            pass
+
+        # Queued nodes have to be written before the database is queried.
+        if self._pending_nodes:
+            self.flush_nodes()
+
+        result = self.tx.run(f'MATCH (a)-[:EXTERNAL_ID]->(:{id_type} {{id: $id}}) RETURN ID(a)', id=id).single()
 
         if result is not None:
+            self._extid_ids[(id_type, id)] = result[0]
             return result[0]
         else:
             return None
@@ -465,28 +792,28 @@ class IYP(object):
 
         self.__create_range_index(type, 'reference_name', on_relationship=True)
 
-        # Create links in batches
-        for i in range(0, len(links), BATCH_SIZE):
-            batch = links[i:i + BATCH_SIZE]
-
-            create_query = f"""WITH $batch AS batch
-            UNWIND batch AS link
-                MATCH (x), (y)
-                WHERE ID(x) = link.src_id AND ID(y) = link.dst_id
-                CREATE (x)-[l:{type}]->(y)
+        # Lookup both nodes with separate MATCH clauses so that each one is a simple
+        # node-by-id seek.
+        create_query = f"""UNWIND $batch AS link
+            MATCH (x) WHERE ID(x) = link.src_id
+            MATCH (y) WHERE ID(y) = link.dst_id
+            CREATE (x)-[l:{type}]->(y)
+            WITH l, link
+            UNWIND link.props AS prop
+                SET l += prop """
+
+        if action == 'merge':
+            create_query = f"""UNWIND $batch AS link
+                MATCH (x) WHERE ID(x) = link.src_id
+                MATCH (y) WHERE ID(y) = link.dst_id
+                MERGE (x)-[l:{type}]-(y)
                 WITH l, link
                 UNWIND link.props AS prop
                     SET l += prop """
 
-            if action == 'merge':
-                create_query = f"""WITH $batch AS batch
-                UNWIND batch AS link
-                    MATCH (x), (y)
-                    WHERE ID(x) = link.src_id AND ID(y) = link.dst_id
-                    MERGE (x)-[l:{type}]-(y)
-                    WITH l,  link
-                    UNWIND link.props AS prop
-                        SET l += prop """
+        # Create links in batches
+        for i in range(0, len(links), BATCH_SIZE):
+            batch = links[i:i + BATCH_SIZE]
 
             res = self.tx.run(create_query, batch=batch)
             res.consume()
@@ -500,34 +827,60 @@ class IYP(object):
 
         By convention link_type is written in UPPERCASE and keys in prop_dict are in
         lowercase.
+
+        src_node and dst_node_id can also be NodePlaceholder objects returned by
+        enqueue_node.
         """
 
         if len(links) == 0:
             return
 
+        # Nodes may still be queued.
+        if self._pending_nodes:
+            self.flush_nodes()
+        src_node = resolve_node_id(src_node)
+
         relationship_types = {e[0] for e in links}
         for relationship_type in relationship_types:
             self.__create_range_index(relationship_type, 'reference_name', on_relationship=True)
 
-        matches = ' MATCH (x)'
-        where = f' WHERE ID(x) = {src_node}'
-        merges = ''
+        # Relationship types and property keys can not be passed as parameters, so
+        # links are grouped by both and each group is written with a single query.
+        groups = defaultdict(list)
+        for type, dst_node, prop in links:
 
-        for i, (type, dst_node, prop) in enumerate(links):
+            for key in REFERENCE_PROPERTIES:
+                assert key in prop
 
-            assert 'reference_org' in prop
-            assert 'reference_url' in prop
-            assert 'reference_name' in prop
-            assert 'reference_time' in prop
+            dst_node = resolve_node_id(dst_node)
 
             prop = format_properties(prop)
-
-            matches += f', (x{i})'
-            where += f' AND ID(x{i}) = {dst_node}'
-            merges += f' MERGE (x)-[:{type}  {dict2str(prop)}]->(x{i}) '
-
-        self.tx.run(matches + where + merges).consume()
-        self.commit()
+            prop = remove_empty_properties(prop)
+            # The reference is usually the same for all links, so links are also
+            # grouped by it and it is sent once per query instead of with every link.
+            reference = tuple([(key, prop[key]) for key in REFERENCE_PROPERTIES if key in prop])
+            link_prop = {key: value for key, value in prop.items() if key not in REFERENCE_PROPERTIES}
+            groups[(type, reference, tuple(link_prop.keys()))].append({'dst_id': dst_node, 'props': link_prop})
+
+        # Send the queries of all groups before waiting for their results.
+        results = list()
+        for (type, reference, prop_keys), group in groups.items():
+            reference = dict(reference)
+            prop_str = ', '.join([f'{key}: $reference.{key}' for key in reference]
+                                 + [f'{key}: link.props.{key}' for key in prop_keys])
+            # The source node is resolved once, before iterating over the links.
+            query = f"""MATCH (x) WHERE ID(x) = $src_id
+                        UNWIND $links AS link
+                        MATCH (y) WHERE ID(y) = link.dst_id
+                        MERGE (x)-[:{type} {{{prop_str}}}]->(y)"""
+
+            for i in range(0, len(group), BATCH_SIZE):
+                batch = group[i: i + BATCH_SIZE]
+                results.append(self.tx.run(query, src_id=src_node, reference=reference, links=batch))
+
+        for result in results:
+            result.consume()
+        self.__commit_write_batch(len(links))
 
     def batch_add_properties(self, id_prop_list):
         """Add properties to existing nodes.
@@ -556,12 +909,13 @@ class BasePostProcess(object):
     def __init__(self):
         """IYP and references initialization."""
 
-        self.reference = {
+        # Reference properties never need formatting.
+        self.reference = NormalizedDict({
             'reference_org': 'Internet Yellow Pages',
             'reference_url': 'https://iyp.iijlab.net',
             'reference_name': 'iyp',
             'reference_time': datetime.combine(datetime.utcnow(), time.min, timezone.utc)
-        }
+        })
 
         # connection to IYP database
         self.iyp = IYP()
@@ -582,12 +936,13 @@ class BaseCrawler(object):
         self.url = url
         self.name = name
 
-        self.reference = {
+        # Reference properties never need formatting.
+        self.reference = NormalizedDict({
             'reference_name': name,
             'reference_org': organization,
             'reference_url': url,
             'reference_time': datetime.combine(datetime.utcnow(), time.min, timezone.utc)
-        }
+        })
 
         # connection to IYP database
         self.iyp = IYP()
@@ -634,7 +989,7 @@ class BaseCrawler(object):
         crawler."""
 
         result = self.iyp.tx.run(
-            f"MATCH ()-[r]->() WHERE r.reference_name = '{self.name}' RETURN count(r) AS count").single()
+            'MATCH ()-[r]->() WHERE r.reference_name = $name RETURN count(r) AS count', name=self.name).single()
 
         return result['count']
 
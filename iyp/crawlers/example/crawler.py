@@ -27,9 +27,11 @@ class Crawler(BaseCrawler):
             sys.exit('Error while fetching data file')
 
         # Process line one after the other
-        for i, line in enumerate(req.text.splitlines()):
-            self.update(line)
-            sys.stderr.write(f'\rProcessed {i} lines')
+        # Group the writes of all lines into a few large transactions
+        with self.iyp.write_batch():
+            for i, line in enumerate(req.text.splitlines()):
+                self.update(line)
+                sys.stderr.write(f'\rProcessed {i} lines')
 
         sys.stderr.write('\n')
 
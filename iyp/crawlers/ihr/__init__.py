@@ -64,9 +64,8 @@ class HegemonyCrawler(BaseCrawler):
         self.csv = lz4Csv(local_filename)
 
         self.timebin = None
-        asn_id = self.iyp.batch_get_nodes_by_single_prop('AS', 'asn', set())
-
-        links = []
+        entries = []
+        asns = set()
 
         for line in csv.reader(self.csv, quotechar='"', delimiter=',', skipinitialspace=True):
             # header
@@ -82,13 +81,16 @@ class HegemonyCrawler(BaseCrawler):
                 break
 
             originasn = int(rec['originasn'])
-            if originasn not in asn_id:
-                asn_id[originasn] = self.iyp.get_node('AS', {'asn': originasn})
-
             asn = int(rec['asn'])
-            if asn not in asn_id:
-                asn_id[asn] = self.iyp.get_node('AS', {'asn': asn})
+            asns.add(originasn)
+            asns.add(asn)
+            entries.append((originasn, asn, rec))
 
+        # Get all AS IDs at once
+        asn_id = self.iyp.batch_get_nodes_by_single_prop('AS', 'asn', asns, all=False)
+
+        links = []
+        for originasn, asn, rec in entries:
             links.append({
                 'src_id': asn_id[originasn],
                 'dst_id': asn_id[asn],
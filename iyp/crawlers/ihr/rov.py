@@ -73,18 +73,13 @@ class Crawler(BaseCrawler):
         local_filename = 'tmp/' + url.rpartition('/')[2]
         self.csv = lz4Csv(local_filename)
 
-        logging.warning('Getting node IDs from neo4j...\n')
-        asn_id = self.iyp.batch_get_nodes_by_single_prop('AS', 'asn')
-        prefix_id = self.iyp.batch_get_nodes_by_single_prop('Prefix', 'prefix')
-        tag_id = self.iyp.batch_get_nodes_by_single_prop('Tag', 'label')
-        country_id = self.iyp.batch_get_nodes_by_single_prop('Country', 'country_code')
+        entries = []
+        asns = set()
+        prefixes = set()
+        tags = set()
+        countries = set()
 
-        orig_links = []
-        tag_links = []
-        dep_links = []
-        country_links = []
-
-        logging.warning('Computing links...\n')
+        logging.warning('Reading data...\n')
         for line in csv.reader(self.csv, quotechar='"', delimiter=',', skipinitialspace=True):
             # header
             # id, timebin, prefix, hege, af, visibility, rpki_status, irr_status,
@@ -96,28 +91,42 @@ class Crawler(BaseCrawler):
             rec['visibility'] = float(rec['visibility'])
             rec['af'] = int(rec['af'])
 
+            prefixes.add(rec['prefix'])
+            asns.add(int(rec['asn_id']))
+
+            # status/country/origin nodes are only needed for lines where asn=originasn
+            if rec['asn_id'] == rec['originasn_id']:
+                asns.add(int(rec['originasn_id']))
+                tags.add('RPKI ' + rec['rpki_status'])
+                tags.add('IRR ' + rec['irr_status'])
+                countries.add(rec['country_id'])
+
+            entries.append(rec)
+
+        self.csv.close()
+
+        # Get all node IDs at once
+        logging.warning('Getting node IDs from neo4j...\n')
+        asn_id = self.iyp.batch_get_nodes_by_single_prop('AS', 'asn', asns, all=False)
+        prefix_id = self.iyp.batch_get_nodes_by_single_prop('Prefix', 'prefix', prefixes, all=False)
+        tag_id = self.iyp.batch_get_nodes_by_single_prop('Tag', 'label', tags, all=False)
+        country_id = self.iyp.batch_get_nodes_by_single_prop('Country', 'country_code', countries, all=False)
+
+        orig_links = []
+        tag_links = []
+        dep_links = []
+        country_links = []
+
+        logging.warning('Computing links...\n')
+        for rec in entries:
             prefix = rec['prefix']
-            if prefix not in prefix_id:
-                prefix_id[prefix] = self.iyp.get_node('Prefix', {'prefix': prefix})
 
             # make status/country/origin links only for lines where asn=originasn
             if rec['asn_id'] == rec['originasn_id']:
-                # Make sure all nodes exist
                 originasn = int(rec['originasn_id'])
-                if originasn not in asn_id:
-                    asn_id[originasn] = self.iyp.get_node('AS', {'asn': originasn})
-
                 rpki_status = 'RPKI ' + rec['rpki_status']
-                if rpki_status not in tag_id:
-                    tag_id[rpki_status] = self.iyp.get_node('Tag', {'label': rpki_status})
-
                 irr_status = 'IRR ' + rec['irr_status']
-                if irr_status not in tag_id:
-                    tag_id[irr_status] = self.iyp.get_node('Tag', {'label': irr_status})
-
                 cc = rec['country_id']
-                if cc not in country_id:
-                    country_id[cc] = self.iyp.get_node('Country', {'country_code': cc})
 
                 # Compute links
                 orig_links.append({
@@ -146,8 +155,6 @@ class Crawler(BaseCrawler):
 
             # Dependency links
             asn = int(rec['asn_id'])
-            if asn not in asn_id:
-                asn_id[asn] = self.iyp.get_node('AS', {'asn': asn})
 
             dep_links.append({
                 'src_id': prefix_id[prefix],
@@ -155,8 +162,6 @@ class Crawler(BaseCrawler):
                 'props': [self.reference, rec]
             })
 
-        self.csv.close()
-
         # Push links to IYP
         logging.warning('Pushing links to neo4j...\n')
         self.iyp.batch_add_links('ORIGINATE', orig_links)